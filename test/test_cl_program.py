@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+import unittest
+import numpy as np
+from tinygrad.dtype import dtypes
+from tinygrad.device import Buffer, Device
+
+@unittest.skipIf(Device.DEFAULT != "GPU", "only test this on GPU")
+class TestCLProgramArgs(unittest.TestCase):
+  def test_swap_bufs_and_vals(self):
+    src = """__kernel void test(__global int* out, __global const int* a, int x) {
+      int gid = get_global_id(0);
+      out[gid] = a[gid] + x;
+    }"""
+    prg = Device["GPU"].runtime("test", Device["GPU"].compiler(src))
+    a, b = Buffer("GPU", 4, dtypes.int32), Buffer("GPU", 4, dtypes.int32)
+    b.copyin(np.arange(4, dtype=np.int32).data)
+    # the kernel args persist between launches, so every launch changes which buffer is the output and the val
+    for (out, inp), x, expected in [((a, b), 1, [1, 2, 3, 4]), ((b, a), 2, [3, 4, 5, 6]), ((a, b), 3, [6, 7, 8, 9])]:
+      prg(out._buf, inp._buf, global_size=(4,1,1), local_size=None, vals=(x,))
+      ret = np.empty(4, np.int32)
+      out.copyout(ret.data)
+      np.testing.assert_equal(ret, expected)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -4,9 +4,9 @@ import numpy as np
 
 from test.helpers import assert_jit_cache_len
 from tinygrad.tensor import Tensor
-from tinygrad.jit import TinyJit
-from tinygrad.device import Device
-from tinygrad.helpers import CI
+from tinygrad.jit import TinyJit, JitItem, apply_graph_to_jit
+from tinygrad.device import Device, CompiledASTRunner
+from tinygrad.helpers import CI, getenv
 
 def _simple_test(add, extract=lambda x: x):
   for _ in range(5):
@@ -316,6 +316,19 @@ class TestJit(unittest.TestCase):
     for i in range(5):
       np.testing.assert_equal(g(Tensor([i]*3), Tensor.ones(3), Tensor.zeros(3)).numpy(), np.array([i+1]*3))
 
+class TestJitBatching(unittest.TestCase):
+  def test_batch_size_doubles(self):
+    class FakeDevice:
+      def __init__(self): self.batches = []
+      def graph(self, batch, input_rawbuffers, var_vals):
+        self.batches.append(len(batch))
+        return len(self.batches)
+    dev = FakeDevice()
+    start = getenv("JIT_BATCH_SIZE", 64)
+    prg = CompiledASTRunner(None, "test", "", b"", dev, [1], [1])  # type: ignore
+    graphed = apply_graph_to_jit([JitItem(prg, [])] * (start*(1+2+4)+3), [], {})
+    self.assertEqual(dev.batches, [start, start*2, start*4, 3])
+    self.assertEqual([ji.prg for ji in graphed], [1, 2, 3, 4])
 
 if __name__ == '__main__':
   unittest.main()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 import unittest
-from tinygrad.device import Device
+from tinygrad.device import Device, CompiledASTRunner
+from tinygrad.shape.symbolic import Variable
 
 class TestDevice(unittest.TestCase):
   def test_canonicalize(self):
@@ -15,5 +16,18 @@ class TestDevice(unittest.TestCase):
     assert Device.canonicalize("GPU:2") == "GPU:2"
     assert Device.canonicalize("disk:/dev/shm/test") == "DISK:/dev/shm/test"
 
+class TestLaunchDims(unittest.TestCase):
+  def test_static_launch_dims(self):
+    prg = CompiledASTRunner(None, "test", "", b"", Device[Device.DEFAULT], [4, 2], [2])
+    assert prg.static_launch_dims
+    self.assertEqual(prg.launch_dims({}), ([4, 2, 1], [2, 1, 1]))
+
+  def test_symbolic_launch_dims(self):
+    a = Variable("a", 1, 10)
+    prg = CompiledASTRunner(None, "test", "", b"", Device[Device.DEFAULT], [a*2, 3], [2])
+    assert not prg.static_launch_dims
+    self.assertEqual(prg.launch_dims({a: 4}), ([8, 3, 1], [2, 1, 1]))
+    self.assertEqual(prg.launch_dims({a: 5}), ([10, 3, 1], [2, 1, 1]))
+
 if __name__ == "__main__":
   unittest.main()
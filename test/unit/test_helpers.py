@@ -1,6 +1,8 @@
 import unittest
 from PIL import Image
+import ctypes
 from tinygrad.helpers import Context, ContextVar, merge_dicts, strip_parens, prod, round_up, fetch, fully_flatten, from_mv, to_mv
+from tinygrad.helpers import encode_args_cuda_style, update_args_cuda_style, args_struct_cuda_style
 from tinygrad.shape.symbolic import Variable, NumNode
 
 VARIABLE = ContextVar("VARIABLE", 0)
@@ -171,5 +173,28 @@ class TestMemoryview(unittest.TestCase):
     mv[0] = 2
     assert base[0] == 2
 
+class TestEncodeArgsCudaStyle(unittest.TestCase):
+  def test_update_args(self):
+    bufs, vals = [ctypes.c_void_p(0x1000), ctypes.c_void_p(0x2000)], (3, -4)
+    config, c_args = encode_args_cuda_style(bufs, vals, ctypes.c_void_p, (1,2,0))
+    update_args_cuda_style(c_args, [ctypes.c_void_p(0x3000), ctypes.c_void_p(0x4000)], (5, -6))
+    self.assertEqual((c_args.f0, c_args.f1, c_args.f2, c_args.f3), (0x3000, 0x4000, 5, -6))
+    self.assertEqual(config[1], ctypes.addressof(c_args))
+
+  def test_update_args_null_and_int(self):
+    _, c_args = encode_args_cuda_style([ctypes.c_void_p(None), 0x2000], (1,), ctypes.c_void_p, (1,2,0))
+    update_args_cuda_style(c_args, [ctypes.c_void_p(None), 0x3000], (2,))
+    self.assertEqual((c_args.f0, c_args.f1, c_args.f2), (None, 0x3000, 2))
+
+  def test_args_struct_cached(self):
+    _, c_args = encode_args_cuda_style([ctypes.c_void_p(0x1000)], (1,), ctypes.c_void_p, (1,2,0))
+    self.assertIs(type(c_args), args_struct_cuda_style(ctypes.c_void_p, 1, 1))
+    self.assertEqual(ctypes.sizeof(c_args), 12)
+
+  def test_update_args_small_ptr(self):
+    _, c_args = encode_args_cuda_style([ctypes.c_uint32(1), ctypes.c_uint32(2)], (3,), ctypes.c_uint32, (1,2,0))
+    update_args_cuda_style(c_args, [ctypes.c_uint32(4), 5], (-6,))
+    self.assertEqual((c_args.f0, c_args.f1, c_args.f2), (4, 5, -6))
+
 if __name__ == '__main__':
   unittest.main()
\ No newline at end of file
@@ -274,6 +274,8 @@ class CompiledASTRunner(JITRunner):
     if local_size is not None: local_size = local_size + [1]*(3-len(local_size))
     self.name, self.display_name, self.prg, self.lib, self.device, self.global_size, self.local_size, self.first_run = \
       to_function_name(name), name, prg, lib, device, global_size, local_size, True
+    # launch dims without Variables are the same on every call, so launch_dims can skip the symbolic evaluation for them
+    self.static_launch_dims = all_int((global_size or []) + (local_size or []))
     self.vars: List[Variable] = []
     if ast:
       info = get_lazyop_info(ast)
@@ -286,6 +288,7 @@ class CompiledASTRunner(JITRunner):
     return self
 
   def launch_dims(self, var_vals):
+    if self.static_launch_dims: return self.global_size, self.local_size
     global_size = [sym_infer(sz, var_vals) for sz in self.global_size] if self.global_size is not None else self.global_size
     local_size = [sym_infer(sz, var_vals) for sz in self.local_size] if self.local_size is not None else self.local_size
     return global_size, local_size
@@ -1,5 +1,5 @@
 from __future__ import annotations
-import os, functools, platform, time, re, contextlib, operator, hashlib, pickle, sqlite3, cProfile, pstats, tempfile, pathlib, string, ctypes
+import os, functools, platform, time, re, contextlib, operator, hashlib, pickle, sqlite3, cProfile, pstats, tempfile, pathlib, string, ctypes, struct
 import itertools, urllib.request
 from tqdm import tqdm
 from typing import Dict, Tuple, Union, List, ClassVar, Optional, Iterable, Any, TypeVar, TYPE_CHECKING, Callable, Sequence
@@ -221,10 +221,23 @@ def compile_cuda_style(prg, compile_options, prog_t, create_prog, compile_prog,
   if status != 0: raise RuntimeError(f"compile failed: {get_bytes(prog, get_log_size, get_log, check).decode()}")
   return get_bytes(prog, get_code_size, get_code, check)
 
+# NOTE: the struct layout only depends on the arg counts, so it's cached on them instead of on the full fields tuple
+@functools.lru_cache(maxsize=None)
+def args_struct_cuda_style(device_ptr_t, nbufs:int, nvals:int):
+  return init_c_struct_t(tuple([(f'f{i}', device_ptr_t) for i in range(nbufs)] + [(f'f{i}', ctypes.c_int) for i in range(nbufs, nbufs+nvals)]))
 def encode_args_cuda_style(bufs, vals, device_ptr_t, marks) -> Tuple[ctypes.Array, ctypes.Structure]:
-  c_args = init_c_struct_t(tuple([(f'f{i}', device_ptr_t) for i in range(len(bufs))] + [(f'f{i}', ctypes.c_int) for i in range(len(bufs), len(bufs)+len(vals))]))(*bufs, *vals)  # noqa: E501
+  c_args = args_struct_cuda_style(device_ptr_t, len(bufs), len(vals))(*bufs, *vals)
   return (ctypes.c_void_p * 5)(ctypes.c_void_p(marks[0]), ctypes.cast(ctypes.pointer(c_args), ctypes.c_void_p), ctypes.c_void_p(marks[1]), ctypes.cast(ctypes.pointer(ctypes.c_size_t(ctypes.sizeof(c_args))), ctypes.c_void_p), ctypes.c_void_p(marks[2])), c_args  # noqa: E501
 
+# NOTE: the args struct is packed, so all buffers and vals can be patched in place with one pack_into instead of a store per field
+# the format is built from the struct's fields, so the buffer pointers take the size of the device_ptr_t the struct was made with
+@functools.lru_cache(maxsize=None)
+def args_packer_cuda_style(args_t) -> struct.Struct:
+  return struct.Struct("<" + "".join("i" if t is ctypes.c_int else {4:"I", 8:"Q"}[ctypes.sizeof(t)] for _,t in args_t._fields_))
+def update_args_cuda_style(c_args:ctypes.Structure, bufs, vals):
+  # NOTE: accept the same bufs as encode_args_cuda_style, a null c_void_p has value None and raw int pointers have no value
+  args_packer_cuda_style(type(c_args)).pack_into(c_args, 0, *[b if isinstance(b, int) else (b.value or 0) for b in bufs], *vals)
+
 def time_execution_cuda_style(cb, ev_t, evcreate, evrecord, evsync, evdestroy, evtime, enable=False) -> Optional[float]:
   if not enable: return cb()
   evs = [init_c_var(ev_t(), lambda x: evcreate(ctypes.byref(x), 0)) for _ in range(2)]
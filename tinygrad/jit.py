@@ -36,16 +36,19 @@ def get_jc_idxs_with_updatable_var_vals(jit_cache: List[JitItem]) -> List[int]:
 def apply_graph_to_jit(jit_cache: List[JitItem], input_rawbuffers: List[Buffer], var_vals: Dict[Variable, int]) -> List[JitItem]:
   # Split JIT cache into batches for faster graph execution.
   # This allows the accelerator to run some batches while subsequent graphs are still being updated.
+  # JIT_BATCH_SIZE is the size of the first batch, it doubles after each graph so long JITs are submitted with few graph launches.
+  max_batch_size = getenv("JIT_BATCH_SIZE", 64)
   graphed_jit_cache: List[JitItem] = []
   current_batch: List[JitItem] = []
   current_device: Union[Compiled, None] = None
 
   # Flush the current batch.
   def flush():
-    nonlocal current_batch, current_device
+    nonlocal current_batch, current_device, max_batch_size
     assert current_device is not None
     try:
       graphed_jit_cache.append(JitItem(current_device.graph(current_batch, input_rawbuffers, var_vals), cast(List[Optional[Buffer]], input_rawbuffers))) # noqa: E501
+      max_batch_size *= 2
       if DEBUG >= 2: print(f"\tJIT GRAPHing batch with {len(current_batch)} kernels on device {current_device}")
     except GraphException as e:
       graphed_jit_cache.extend(current_batch)
@@ -65,7 +68,7 @@ def apply_graph_to_jit(jit_cache: List[JitItem], input_rawbuffers: List[Buffer],
 
     # The flush is done when (1) ji is the last one, (2) the size of batch exceeds the maximum batch size or
     # (3) the current jit item cannot be graphed, so the current batch is flushed before such a jit item is added.
-    if len(current_batch) > 0 and (i==len(jit_cache)-1 or len(current_batch) >= getenv("JIT_BATCH_SIZE", 64) or not can_be_graphed): flush()
+    if len(current_batch) > 0 and (i==len(jit_cache)-1 or len(current_batch) >= max_batch_size or not can_be_graphed): flush()
 
     # If the jit item cannot be graphed, put it right into the final cache after the flush.
     if not can_be_graphed: graphed_jit_cache.append(ji)
@@ -111,7 +114,8 @@ class TinyJit(Generic[ReturnType]):
                  for x,y in zip(self.expected_name_sts_dtype_device, expected_name_sts_dtype_device)), \
         f"mismatch of input tensors, expected {self.expected_name_sts_dtype_device} got {expected_name_sts_dtype_device}"
       for (j,i),input_idx in self.input_replace.items(): self.jit_cache[j].rawbufs[i] = input_rawbuffers[input_idx]
-      for ji in self.jit_cache: ji.prg(cast(List[Buffer], ji.rawbufs), var_vals, wait=DEBUG>=2, jit=True)
+      wait = DEBUG>=2
+      for ji in self.jit_cache: ji.prg(cast(List[Buffer], ji.rawbufs), var_vals, wait=wait, jit=True)
     elif self.cnt == 1:
       # jit capture
       self.expected_vals, self.expected_name_sts_dtype_device = expected_vals, expected_name_sts_dtype_device
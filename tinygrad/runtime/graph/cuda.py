@@ -20,7 +20,7 @@ class CUDAGraph:
     self.jc_idxs_with_updatable_launch_dims = get_jc_idxs_with_updatable_launch_dims(jit_cache)
     self.jc_idxs_with_updatable_var_vals = get_jc_idxs_with_updatable_var_vals(jit_cache)
     self.jc_idxs_with_updatable_rawbufs = list(set([x[0] for x in self.input_replace.keys()]))
-    self.updatable_nodes: Dict[int, Tuple[Any, Any, Any]] = {} # Dict[jc index] = tuple(graph node, node params, input kernel params)
+    self.updatable_nodes: Dict[int, Tuple[Any, Any, Any, Any]] = {} # Dict[jc index] = tuple(graph node, node params, input kernel params, params ref)
 
     self.graph = self.graph_create()
     graph_node: Optional[ctypes._CData] = None
@@ -35,28 +35,30 @@ class CUDAGraph:
       graph_node = self.graph_add_kernel_node(self.graph, c_deps, c_node_params)
 
       if j in self.jc_idxs_with_updatable_launch_dims or j in self.jc_idxs_with_updatable_var_vals or j in self.jc_idxs_with_updatable_rawbufs:
-        self.updatable_nodes[j] = (graph_node, c_node_params, c_input_params)
+        self.updatable_nodes[j] = (graph_node, c_node_params, c_input_params, ctypes.byref(c_node_params))
 
+    # resolve where each input buffer goes once, so a replay doesn't look up the node and format the field name for every input
+    self.input_fields = [(self.updatable_nodes[j][2], f'f{i}', input_idx) for (j,i),input_idx in self.input_replace.items()]
+    # same for the var_vals, they follow the rawbufs in the c_input_params struct
+    self.var_fields = [(self.updatable_nodes[j][2], f'f{len(self.jit_cache[j].rawbufs)+i}', v)
+                       for j in self.jc_idxs_with_updatable_var_vals for i,v in enumerate(cast(CompiledASTRunner, self.jit_cache[j].prg).vars)]
     self.instance = self.graph_instantiate(self.graph)
 
   def __call__(self, input_rawbuffers: List[Buffer], var_vals: Dict[Variable, int], wait=False, jit=False) -> Optional[float]:
     self.set_device()
     # Update rawbuffers in the c_input_params struct.
-    for (j,i),input_idx in self.input_replace.items():
-      setattr(self.updatable_nodes[j][2], f'f{i}', input_rawbuffers[input_idx]._buf)
+    for c_input_params, field, input_idx in self.input_fields: setattr(c_input_params, field, input_rawbuffers[input_idx]._buf)
 
     # Update var_vals in the c_input_params struct.
-    for j in self.jc_idxs_with_updatable_var_vals:
-      for i,v in enumerate(cast(CompiledASTRunner, self.jit_cache[j].prg).vars):
-        setattr(self.updatable_nodes[j][2], f'f{len(self.jit_cache[j].rawbufs) + i}', var_vals[v])
+    for c_input_params, field, v in self.var_fields: setattr(c_input_params, field, var_vals[v])
 
     # Update launch dims in the c_node_params struct.
     for j in self.jc_idxs_with_updatable_launch_dims:
       self.set_kernel_node_launch_dims(self.updatable_nodes[j][1], *cast(CompiledASTRunner, self.jit_cache[j].prg).launch_dims(var_vals))
 
     # Update graph nodes with the updated structs.
-    for node, c_node_params, _ in self.updatable_nodes.values():
-      self.graph_exec_kernel_node_set_params(self.instance, node, ctypes.byref(c_node_params))
+    for node, _, _, c_node_params_ref in self.updatable_nodes.values():
+      self.graph_exec_kernel_node_set_params(self.instance, node, c_node_params_ref)
 
     et = self.graph_launch(self.instance, None, wait=wait)
     update_stats(f"<batched {len(self.jit_cache)}>", self.op_estimate, self.mem_estimate, var_vals, et, buf_count=len(input_rawbuffers),
@@ -2,14 +2,14 @@ import ctypes
 from typing import Tuple
 import gpuctypes.hip as hip
 from tinygrad.helpers import init_c_var
-from tinygrad.runtime.ops_hip import check, hip_time_execution
+from tinygrad.runtime.ops_hip import check, hip_time_execution, hip_set_device
 from tinygrad.runtime.graph.cuda import CUDAGraph
 
 class HIPGraph(CUDAGraph):
   def __del__(self):
     if hasattr(self, 'graph'): check(hip.hipGraphDestroy(self.graph))
     if hasattr(self, 'instance'): check(hip.hipGraphExecDestroy(self.instance))
-  def set_device(self): check(hip.hipSetDevice(self.device))
+  def set_device(self): hip_set_device(self.device)
   def encode_args_info(self): return (hip.hipDeviceptr_t, (1,2,3))
   def graph_create(self): return init_c_var(hip.hipGraph_t(), lambda x: check(hip.hipGraphCreate(ctypes.byref(x), 0)))
   def graph_instantiate(self, graph):
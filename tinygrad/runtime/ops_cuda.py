@@ -1,9 +1,9 @@
 from __future__ import annotations
-import subprocess, hashlib, tempfile, ctypes, ctypes.util, functools, re
+import subprocess, hashlib, tempfile, ctypes, ctypes.util, functools, re, threading
 from pathlib import Path
 from typing import Tuple, Optional
 import gpuctypes.cuda as cuda
-from tinygrad.helpers import DEBUG, getenv, from_mv, init_c_var, colored, cpu_time_execution, compile_cuda_style, encode_args_cuda_style, time_execution_cuda_style  # noqa: E501
+from tinygrad.helpers import DEBUG, getenv, from_mv, init_c_var, colored, cpu_time_execution, compile_cuda_style, encode_args_cuda_style, update_args_cuda_style, time_execution_cuda_style  # noqa: E501
 from tinygrad.device import Compiled, LRUAllocator, MallocAllocator
 from tinygrad.codegen.kernel import LinearizerOptions
 from tinygrad.renderer.cstyle import CUDARenderer
@@ -27,6 +27,13 @@ if CUDACPU:
 def check(status):
   if status != 0: raise RuntimeError(f"CUDA Error {status}, {ctypes.string_at(init_c_var(ctypes.POINTER(ctypes.c_char)(), lambda x: cuda.cuGetErrorString(status, ctypes.byref(x)))).decode()}")  # noqa: E501
 
+# NOTE: the current context is per host thread, shadow it so cuCtxSetCurrent is only called when the context actually changes
+cu_current_context = threading.local()
+def cu_set_current(ctx):
+  if getattr(cu_current_context, "ctx", None) is ctx: return
+  check(cuda.cuCtxSetCurrent(ctx))
+  cu_current_context.ctx = ctx
+
 def cu_time_execution(cb, enable=False) -> Optional[float]: return time_execution_cuda_style(cb, cuda.CUevent, cuda.cuEventCreate, cuda.cuEventRecord, cuda.cuEventSynchronize, cuda.cuEventDestroy_v2, cuda.cuEventElapsedTime, enable=enable) if not CUDACPU else cpu_time_execution(cb, enable=enable)  # noqa: E501
 
 def compile_cuda(prg:str, arch="sm_35") -> bytes: return compile_cuda_style(prg, [f'--gpu-architecture={arch}', "-I/usr/local/cuda/include", "-I/usr/include", "-I/opt/cuda/include/"], cuda.nvrtcProgram, cuda.nvrtcCreateProgram, cuda.nvrtcCompileProgram, cuda.nvrtcGetPTX, cuda.nvrtcGetPTXSize, cuda.nvrtcGetProgramLog, cuda.nvrtcGetProgramLogSize, check)  # noqa: E501
@@ -34,6 +41,7 @@ def compile_cuda(prg:str, arch="sm_35") -> bytes: return compile_cuda_style(prg,
 class CUDAProgram:
   def __init__(self, device:CUDADevice, name:str, lib:bytes):
     self.device, self.name, self.lib = device, name, lib
+    self.launch_args = threading.local()  # args template, per host thread so concurrent launches never patch each other's args
     if DEBUG >= 5: print("\n".join([f"{i+1:>3} {line}" for i, line in enumerate(pretty_ptx(lib.decode('utf-8')).split("\n"))]))
     if DEBUG >= 6:
       try:
@@ -44,7 +52,7 @@ class CUDAProgram:
       except Exception as e: print("failed to generate SASS", str(e))
 
     if not CUDACPU:
-      check(cuda.cuCtxSetCurrent(self.device.context))
+      cu_set_current(self.device.context)
       self.module = init_c_var(cuda.CUmodule(), lambda x: check(cuda.cuModuleLoadData(ctypes.byref(x), lib)))
       check(cuda.cuModuleGetFunction(ctypes.byref(prg := cuda.CUfunction()), self.module, name.encode("utf-8")))
     self.prg = prg if not CUDACPU else lib
@@ -53,8 +61,13 @@ class CUDAProgram:
     if hasattr(self, 'module'): check(cuda.cuModuleUnload(self.module))
 
   def __call__(self, *bufs, global_size:Tuple[int,int,int], local_size:Tuple[int,int,int], vals:Tuple[int, ...]=(), wait=False):
-    if not CUDACPU: check(cuda.cuCtxSetCurrent(self.device.context))
-    c_kernel_input_config = encode_args_cuda_style(bufs, vals, cuda.CUdeviceptr_v2, (1,2,0))[0] if not CUDACPU else (bufs+tuple(vals))
+    if not CUDACPU:
+      cu_set_current(self.device.context)
+      # the marks and pointers in the kernel config never change, build it once and only patch the args. CUDA copies the args at launch
+      la = self.launch_args
+      if not hasattr(la, 'c_args'): la.c_kernel_config, la.c_args = encode_args_cuda_style(bufs, vals, cuda.CUdeviceptr_v2, (1,2,0))
+      else: update_args_cuda_style(la.c_args, bufs, vals)
+    c_kernel_input_config = self.launch_args.c_kernel_config if not CUDACPU else (bufs+tuple(vals))
     return cu_time_execution(lambda: check(cuda.cuLaunchKernel(self.prg, *global_size, *local_size, 0, None, None, c_kernel_input_config)), enable=wait)  # noqa: E501
 
 class CUDAAllocator(LRUAllocator):
@@ -62,14 +75,14 @@ class CUDAAllocator(LRUAllocator):
     self.device = device
     super().__init__()
   def _alloc(self, size):
-    check(cuda.cuCtxSetCurrent(self.device.context))
+    cu_set_current(self.device.context)
     return init_c_var(cuda.CUdeviceptr(), lambda x: check(cuda.cuMemAlloc_v2(ctypes.byref(x), size)))
   def _free(self, opaque): check(cuda.cuMemFree_v2(opaque))
   def copyin(self, dest, src:memoryview):
-    check(cuda.cuCtxSetCurrent(self.device.context))
+    cu_set_current(self.device.context)
     check(cuda.cuMemcpyHtoD_v2(dest, from_mv(src), len(src), None))
   def copyout(self, dest:memoryview, src):
-    check(cuda.cuCtxSetCurrent(self.device.context))
+    cu_set_current(self.device.context)
     check(cuda.cuMemcpyDtoH_v2(from_mv(dest), src, len(dest)))
 
 class CUDADevice(Compiled):
@@ -79,6 +92,7 @@ class CUDADevice(Compiled):
       check(cuda.cuInit(0))
       check(cuda.cuDeviceGet(ctypes.byref(device := cuda.CUdevice()), device_id))
       self.context = init_c_var(cuda.CUcontext(), lambda x: check(cuda.cuCtxCreate_v2(ctypes.byref(x), 0, device)))
+      cu_current_context.ctx = self.context  # cuCtxCreate makes the new context current
       check(cuda.cuDeviceComputeCapability(ctypes.byref(major := ctypes.c_int()), ctypes.byref(minor := ctypes.c_int()), device_id))
     self.arch = f"sm_{major.value}{minor.value}" if not CUDACPU else "sm_35"
 
@@ -89,5 +103,5 @@ class CUDADevice(Compiled):
                      graph=CUDAGraph if not CUDACPU else None)
   def synchronize(self):
     if not CUDACPU:
-      check(cuda.cuCtxSetCurrent(self.context))
+      cu_set_current(self.context)
       check(cuda.cuCtxSynchronize())
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Any
 import ctypes, functools, hashlib
 import gpuctypes.opencl as cl
 from tinygrad.helpers import init_c_var, to_char_p_p, from_mv, OSX, DEBUG
@@ -36,14 +36,21 @@ class CLProgram:
     check(binary_status.value)
     check(cl.clBuildProgram(self.program, 1, ctypes.byref(device.device_id), None, cl.clBuildProgram.argtypes[4](), None)) # NOTE: OSX requires this
     self.kernel = checked(cl.clCreateKernel(self.program, name.encode(), ctypes.byref(status := ctypes.c_int32())), status)
+    self.args: List[Any] = []  # what is currently set on the kernel, OpenCL keeps kernel args between launches
 
   def __del__(self):
     if hasattr(self, 'kernel'): check(cl.clReleaseKernel(self.kernel))
     if hasattr(self, 'program'): check(cl.clReleaseProgram(self.program))
 
   def __call__(self, *bufs:cl.cl_mem, global_size:Tuple[int,...], local_size:Optional[Tuple[int,...]]=None, vals:Tuple[int, ...]=(), wait=False) -> Optional[float]:  # noqa: E501
-    for i,b in enumerate(bufs): cl.clSetKernelArg(self.kernel, i, ctypes.sizeof(b), ctypes.byref(b))
-    for i,b in enumerate(vals,start=len(bufs)): cl.clSetKernelArg(self.kernel, i, 4, ctypes.byref(ctypes.c_int32(b)))
+    # repeated launches of the same kernel only set the args that changed since the last one
+    if len(self.args) != len(bufs)+len(vals): self.args = [None]*(len(bufs)+len(vals))
+    for i,b in enumerate(bufs):
+      if self.args[i] is not b: cl.clSetKernelArg(self.kernel, i, ctypes.sizeof(b), ctypes.byref(b))
+      self.args[i] = b
+    for i,b in enumerate(vals,start=len(bufs)):
+      if self.args[i] != b: cl.clSetKernelArg(self.kernel, i, 4, ctypes.byref(ctypes.c_int32(b)))
+      self.args[i] = b
     if local_size is not None: global_size = tuple(int(g*l) for g,l in zip(global_size, local_size))
     event = cl.cl_event() if wait else None
     check(cl.clEnqueueNDRangeKernel(self.device.queue, self.kernel, len(global_size), None, (ctypes.c_size_t * len(global_size))(*global_size), (ctypes.c_size_t * len(local_size))(*local_size) if local_size else None, 0, None, event))  # noqa: E501